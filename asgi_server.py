@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+ASGI serving mode for the summarization server.
+
+Serves the same /health and /summarize contract as python_server.py, but
+I/O runs on the asyncio event loop, request parsing runs in asyncio's
+default thread pool, and inference runs in a dedicated, bounded thread pool.
+Health checks stay fast while the model is busy, and shutdown waits for
+in-flight chunks to finish.
+
+Run with: python3 asgi_server.py
+"""
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import autotune
+from body_codec import BodyDecoder, BodyError
+from python_server import PORT, model_pool, prepare_request, summarize_chunks, summary_response
+
+# Threads running model inference: INFERENCE_THREADS if set, else the worker
+# count tuned for this host, else one thread using torch's intra-op parallelism
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS")
+                        or autotune.active_config["recommendedWorkers"] or 1)
+autotune.active_config["workers"] = INFERENCE_THREADS
+# Requests allowed to wait for or run inference before new ones are rejected
+MAX_PENDING = int(os.environ.get("MAX_PENDING", "16"))
+
+executor = None
+pending = 0
+
+
+async def run_inference(fn, *args):
+    """Run a blocking model call on the inference executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, fn, *args)
+
+
+def summarize_job(job):
+    with model_pool.acquire(job["model"]) as summarizer:
+        return summarize_chunks(summarizer, job["chunks"])
+
+
+def tune_default_model():
+    with model_pool.acquire() as summarizer:
+        return autotune.tune(summarizer)
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def models(request):
+    return JSONResponse(model_pool.stats())
+
+
+async def config(request):
+    return JSONResponse(dict(autotune.active_config, host=autotune.host_fingerprint()))
+
+
+async def config_tune(request):
+    try:
+        best, results = await run_inference(tune_default_model)
+        return JSONResponse({"best": best, "results": results})
+    except Exception as e:
+        print(f"Error tuning: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def summarize(request):
+    global pending
+    try:
+        try:
+            decoder = BodyDecoder(request.headers.get('content-encoding'),
+                                  request.headers.get('content-type'))
+            async for chunk in request.stream():
+                decoder.feed(chunk)
+            # Parsing, sentence splitting and chunking are CPU-bound; keep them off
+            # the event loop but out of the inference pool so they don't queue behind it
+            job = await asyncio.to_thread(lambda: prepare_request(decoder.finish()))
+        except BodyError as e:
+            return JSONResponse({"error": str(e)}, status_code=e.status)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        if pending >= MAX_PENDING:
+            return JSONResponse({"error": "Server busy, try again later"}, status_code=503)
+
+        pending += 1
+        try:
+            summary_parts, fallbacks = await run_inference(summarize_job, job)
+        finally:
+            pending -= 1
+
+        return JSONResponse(summary_response(job, summary_parts, fallbacks))
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global executor
+    executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+    # Start loading the model in the background so /health answers immediately
+    asyncio.get_running_loop().run_in_executor(executor, model_pool.load)
+    try:
+        yield
+    finally:
+        # Let queued and in-flight chunks finish before the process exits
+        print("Waiting for in-flight inference to finish...")
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+        print("Inference executor stopped")
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/models', models, methods=['GET']),
+        Route('/config', config, methods=['GET']),
+        Route('/config/tune', config_tune, methods=['POST']),
+        Route('/summarize', summarize, methods=['POST']),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    uvicorn.run(app, host='0.0.0.0', port=PORT, timeout_graceful_shutdown=300)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+CPU inference autotuner for the summarization server.
+
+Runs short calibration passes with the loaded summarizer over torch thread
+counts, batch size and inference worker count, and stores the best
+configuration per host fingerprint in a local JSON file so it can be applied
+at boot. Worker count sizes the ASGI server's inference pool.
+"""
+import os
+import json
+import time
+import hashlib
+import platform
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+TUNED_CONFIG_FILE = os.environ.get(
+    "AUTOTUNE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".autotune.json"),
+)
+
+CALIBRATION_TEXT = (
+    "Photosynthesis is the process by which green plants convert light energy "
+    "into chemical energy stored in glucose. It takes place mainly in the "
+    "chloroplasts of leaf cells, where chlorophyll absorbs red and blue light. "
+    "The light-dependent reactions split water, release oxygen and produce ATP "
+    "and NADPH. The Calvin cycle then uses these molecules to fix carbon dioxide "
+    "into three-carbon sugars that the plant assembles into glucose and starch. "
+)
+
+# Active settings, reported by the /config endpoint
+active_config = {
+    "numThreads": None,
+    "interopThreads": None,
+    "batchSize": 1,
+    # Inference pool size in effect (ASGI mode only) and the tuned value
+    "workers": None,
+    "recommendedWorkers": None,
+    "source": "default",
+    "applied": False,
+    # Stored settings that only take effect after a restart
+    "pendingRestart": {},
+}
+
+
+class InferenceGate:
+    """
+    Lets inference calls run concurrently but gives calibration exclusive use
+    of the process, since it changes torch's process-wide thread count and
+    its timings would be skewed by concurrent requests.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._running = 0
+        self._calibrating = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._cond:
+            # Waiting calibrations go first so a steady stream of requests cannot starve them
+            while self._calibrating or self._waiting:
+                self._cond.wait()
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._waiting += 1
+            while self._calibrating or self._running:
+                self._cond.wait()
+            self._waiting -= 1
+            self._calibrating = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._calibrating = False
+                self._cond.notify_all()
+
+
+inference_gate = InferenceGate()
+
+
+def host_fingerprint():
+    """Identify the host hardware so tuned configs are not shared across CPU types"""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    parts = [
+        platform.system(),
+        platform.machine(),
+        cpu_model,
+        str(os.cpu_count()),
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def load_tuned_configs(path=TUNED_CONFIG_FILE):
+    """Read all stored configs, keyed by host fingerprint"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_tuned_config(config, path=TUNED_CONFIG_FILE):
+    """Store the config for this host, keeping entries for other hosts"""
+    configs = load_tuned_configs(path)
+    configs[host_fingerprint()] = config
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(configs, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_config_for_host(path=TUNED_CONFIG_FILE):
+    """Select the stored config for this host as the active one, without touching torch"""
+    config = load_tuned_configs(path).get(host_fingerprint())
+    if config:
+        active_config.update(
+            numThreads=config.get("numThreads"),
+            interopThreads=config.get("interopThreads"),
+            batchSize=config.get("batchSize", 1),
+            recommendedWorkers=config.get("workers"),
+            source=path,
+        )
+    return active_config
+
+
+def _read_back(torch, wanted_interop):
+    """Report the thread counts torch is actually using"""
+    active_config["numThreads"] = torch.get_num_threads()
+    active_config["interopThreads"] = torch.get_num_interop_threads()
+    pending = {}
+    if wanted_interop and wanted_interop != active_config["interopThreads"]:
+        pending["interopThreads"] = wanted_interop
+    wanted_workers = active_config["recommendedWorkers"]
+    if active_config["workers"] and wanted_workers and wanted_workers != active_config["workers"]:
+        pending["workers"] = wanted_workers
+    active_config["pendingRestart"] = pending
+
+
+def apply_config():
+    """Apply the active thread settings to torch"""
+    import torch
+
+    wanted_interop = active_config["interopThreads"]
+    if wanted_interop:
+        try:
+            torch.set_num_interop_threads(wanted_interop)
+        except RuntimeError as e:
+            # Only settable before the first parallel region runs
+            print(f"Could not set interop threads: {e}")
+    if active_config["numThreads"]:
+        torch.set_num_threads(active_config["numThreads"])
+
+    _read_back(torch, wanted_interop)
+    active_config["applied"] = True
+    return active_config
+
+
+def _candidate_counts(limit):
+    """Powers of two up to limit, plus limit itself"""
+    counts = []
+    n = 1
+    while n < limit:
+        counts.append(n)
+        n *= 2
+    counts.append(limit)
+    return counts
+
+
+# A candidate whose throughput falls below this share of the best so far is
+# not measured further
+CLEARLY_SLOWER = 0.8
+
+CALIBRATION_KWARGS = {"max_length": 40, "min_length": 10, "do_sample": False}
+
+
+def _time_pass(summarizer, chunks, batch_size, summarize_kwargs):
+    start = time.perf_counter()
+    summarizer(chunks, batch_size=batch_size, **summarize_kwargs)
+    return time.perf_counter() - start
+
+
+def _measure(summarizer, chunk, batch_size, summarize_kwargs, best_so_far, rounds=2):
+    """Chunks per second for one batch size, skipping repeat rounds once clearly behind"""
+    chunks = [chunk] * batch_size
+    fastest = None
+    for _ in range(rounds):
+        elapsed = _time_pass(summarizer, chunks, batch_size, summarize_kwargs)
+        fastest = elapsed if fastest is None else min(fastest, elapsed)
+        if batch_size / fastest < CLEARLY_SLOWER * best_so_far:
+            break
+    return batch_size / fastest
+
+
+def _measure_workers(summarizer, chunk, batch_size, workers, summarize_kwargs):
+    """Chunks per second with several inference threads running passes at once"""
+    chunks = [chunk] * batch_size
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(_time_pass, summarizer, chunks, batch_size, summarize_kwargs)
+                   for _ in range(workers)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return workers * batch_size / elapsed
+
+
+def calibrate(summarizer, chunk_words=100, batch_sizes=(1, 2, 4), max_workers=4,
+              summarize_kwargs=None):
+    """
+    Time short summarization passes and pick the fastest configuration.
+
+    Passes use ~100-word inputs and a low max_length so a full run takes
+    seconds rather than minutes. Thread counts are tried in increasing order
+    and the scan stops once a count is clearly slower than the best so far;
+    larger batch sizes are skipped the same way. Worker counts are then
+    measured by running that many passes concurrently, splitting the best
+    single-worker thread count between them. Interop threads can only be set
+    once per process and are left as they are.
+    """
+    import torch
+
+    summarize_kwargs = summarize_kwargs or CALIBRATION_KWARGS
+    words = CALIBRATION_TEXT.split()
+    chunk = " ".join((words * (chunk_words // len(words) + 1))[:chunk_words])
+
+    cpus = os.cpu_count() or 1
+    original_threads = torch.get_num_threads()
+    results = []
+    best_throughput = 0.0
+
+    # Warm-up pass so one-time allocation cost is not charged to the first candidate
+    _time_pass(summarizer, [chunk], 1, summarize_kwargs)
+
+    try:
+        for threads in _candidate_counts(cpus):
+            torch.set_num_threads(threads)
+            threads_best = 0.0
+            for batch_size in batch_sizes:
+                throughput = _measure(summarizer, chunk, batch_size, summarize_kwargs, best_throughput)
+                results.append({
+                    "numThreads": threads,
+                    "batchSize": batch_size,
+                    "workers": 1,
+                    "chunksPerSecond": round(throughput, 3),
+                })
+                print(f"Calibration: threads={threads} batch={batch_size} "
+                      f"-> {throughput:.2f} chunks/s")
+                if throughput < CLEARLY_SLOWER * threads_best:
+                    break
+                threads_best = max(threads_best, throughput)
+                best_throughput = max(best_throughput, throughput)
+            if threads_best < CLEARLY_SLOWER * best_throughput:
+                break
+
+        single = max(results, key=lambda r: r["chunksPerSecond"])
+        for workers in _candidate_counts(min(max_workers, cpus))[1:]:
+            threads = max(1, single["numThreads"] // workers)
+            torch.set_num_threads(threads)
+            throughput = _measure_workers(summarizer, chunk, single["batchSize"],
+                                          workers, summarize_kwargs)
+            results.append({
+                "numThreads": threads,
+                "batchSize": single["batchSize"],
+                "workers": workers,
+                "chunksPerSecond": round(throughput, 3),
+            })
+            print(f"Calibration: workers={workers} threads={threads} "
+                  f"batch={single['batchSize']} -> {throughput:.2f} chunks/s")
+            if throughput < CLEARLY_SLOWER * best_throughput:
+                break
+            best_throughput = max(best_throughput, throughput)
+    finally:
+        torch.set_num_threads(original_threads)
+
+    best = max(results, key=lambda r: r["chunksPerSecond"])
+    best = dict(best, host=host_fingerprint(), tunedAt=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    return best, results
+
+
+def tune(summarizer, path=TUNED_CONFIG_FILE, **kwargs):
+    """Calibrate, store the best config for this host and make it active"""
+    import torch
+
+    with inference_gate.exclusive():
+        best, results = calibrate(summarizer, **kwargs)
+
+        # Keep a hand-set interop thread count; calibration does not measure it
+        stored = load_tuned_configs(path).get(host_fingerprint(), {})
+        if stored.get("interopThreads"):
+            best["interopThreads"] = stored["interopThreads"]
+        save_tuned_config(best, path)
+
+        torch.set_num_threads(best["numThreads"])
+        active_config.update(batchSize=best["batchSize"], recommendedWorkers=best["workers"],
+                             source=path)
+        _read_back(torch, best.get("interopThreads"))
+    return best, results
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Request body decoding for /summarize.
+
+Bodies may be gzip- or zstd-compressed (Content-Encoding) and either JSON or
+MessagePack (Content-Type). Bodies are fed in as they arrive from the socket
+and decompressed with a cap on the output size, so a small compressed body
+cannot expand into an unbounded amount of memory.
+
+zstd and MessagePack support need the optional `zstandard` and `msgpack`
+packages.
+"""
+import os
+import json
+import zlib
+
+MAX_BODY_BYTES = int(os.environ.get("MAX_BODY_BYTES", str(4 * 2**20)))
+READ_SIZE = 64 * 1024
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+class BodyError(ValueError):
+    """Request body could not be decoded; status is the HTTP status to return"""
+    status = 400
+
+
+class BodyTooLarge(BodyError):
+    status = 413
+
+
+class UnsupportedBody(BodyError):
+    status = 415
+
+
+class _CappedSink:
+    """Write target for the zstd stream writer that enforces the decoder's size cap"""
+
+    def __init__(self, decoder):
+        self.decoder = decoder
+
+    def write(self, data):
+        self.decoder._append(bytes(data))
+        return len(data)
+
+
+class BodyDecoder:
+    def __init__(self, content_encoding=None, content_type=None, limit=MAX_BODY_BYTES):
+        self.encoding = (content_encoding or "identity").strip().lower()
+        self.content_type = (content_type or "application/json").split(";")[0].strip().lower()
+        self.limit = limit
+        self._received = 0
+        self._parts = []
+        self._size = 0
+
+        if self.encoding in ("gzip", "x-gzip"):
+            self._gzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise UnsupportedBody("zstd bodies require the zstandard package")
+            # Output is pushed to the sink in READ_SIZE pieces as input arrives
+            self._zstd = zstandard.ZstdDecompressor().stream_writer(
+                _CappedSink(self), write_size=READ_SIZE)
+        elif self.encoding != "identity":
+            raise UnsupportedBody(f"Unsupported Content-Encoding: {self.encoding}")
+
+        if self.content_type in MSGPACK_TYPES:
+            try:
+                import msgpack
+            except ImportError:
+                raise UnsupportedBody("MessagePack bodies require the msgpack package")
+            self._msgpack = msgpack
+        elif self.content_type != "application/json":
+            raise UnsupportedBody(f"Unsupported Content-Type: {self.content_type}")
+
+    def _append(self, data):
+        self._size += len(data)
+        if self._size > self.limit:
+            raise BodyTooLarge(f"Request body exceeds {self.limit} bytes")
+        self._parts.append(data)
+
+    def feed(self, chunk):
+        """Accept the next piece of the raw request body"""
+        self._received += len(chunk)
+        if self._received > self.limit:
+            raise BodyTooLarge(f"Request body exceeds {self.limit} bytes")
+
+        if self.encoding in ("gzip", "x-gzip"):
+            # Bound each step's output so a bomb fails as soon as it passes the limit
+            data = chunk
+            try:
+                while data:
+                    self._append(self._gzip.decompress(data, READ_SIZE))
+                    data = self._gzip.unconsumed_tail
+            except zlib.error as e:
+                raise BodyError(f"Invalid gzip body: {e}")
+            self._check_gzip_trailer()
+        elif self.encoding == "zstd":
+            try:
+                self._zstd.write(chunk)
+            except BodyError:
+                raise
+            except Exception as e:
+                raise BodyError(f"Invalid zstd body: {e}")
+        else:
+            self._parts.append(chunk)
+
+    def _check_gzip_trailer(self):
+        # Only a single gzip member is accepted; anything after it is rejected
+        if self._gzip.unused_data:
+            raise BodyError("Unexpected data after gzip body")
+
+    def _finish_bytes(self):
+        if self.encoding in ("gzip", "x-gzip"):
+            try:
+                self._append(self._gzip.flush())
+            except zlib.error as e:
+                raise BodyError(f"Invalid gzip body: {e}")
+            if not self._gzip.eof:
+                raise BodyError("Truncated gzip body")
+            self._check_gzip_trailer()
+
+        return b"".join(self._parts)
+
+    def finish(self):
+        """Decompress and parse the complete body into a dict"""
+        raw = self._finish_bytes()
+        try:
+            if self.content_type in MSGPACK_TYPES:
+                data = self._msgpack.unpackb(raw, raw=False)
+            else:
+                data = json.loads(raw)
+        except Exception as e:
+            raise BodyError(f"Invalid request body: {e}")
+
+        if not isinstance(data, dict):
+            raise BodyError("Request body must be an object")
+        # MessagePack clients may send the document as raw UTF-8 bytes
+        if isinstance(data.get("content"), bytes):
+            try:
+                data["content"] = data["content"].decode("utf-8")
+            except UnicodeDecodeError:
+                raise BodyError("content must be UTF-8 encoded")
+        return data
+
+
+def decode_stream(stream, content_encoding=None, content_type=None, limit=MAX_BODY_BYTES):
+    """Read a file-like request stream through a BodyDecoder"""
+    decoder = BodyDecoder(content_encoding, content_type, limit)
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        decoder.feed(chunk)
+    return decoder.finish()
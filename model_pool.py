@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Thread-safe, memory-bounded pool of summarization models.
+
+Models are registered by name with a local directory (or hub id) and loaded
+on first use, each behind its own lock so concurrent requests never load the
+same model twice. When the resident models exceed the memory budget, the
+least recently used model that no request is currently using is unloaded.
+"""
+import gc
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+WEIGHT_SUFFIXES = (".bin", ".safetensors", ".pt", ".pth")
+
+
+def parse_model_specs(spec):
+    """Parse "name=path,name2=path2" into an ordered {name: path} dict"""
+    models = OrderedDict()
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, path = entry.partition("=")
+        if not sep:
+            name, path = os.path.basename(entry.rstrip("/")), entry
+        models[name.strip()] = path.strip()
+    return models
+
+
+def estimate_disk_bytes(path):
+    """Size of the weight files in a local model directory, or None if unknown"""
+    if not os.path.isdir(path):
+        return None
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.endswith(WEIGHT_SUFFIXES):
+                total += os.path.getsize(os.path.join(dirpath, filename))
+    return total or None
+
+
+def model_bytes(summarizer):
+    """Memory held by a pipeline's parameters and buffers"""
+    model = getattr(summarizer, "model", None)
+    if model is None:
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelPool:
+    def __init__(self, models, loader, default=None, budget_bytes=0):
+        if not models:
+            raise ValueError("At least one model must be configured")
+        self.models = OrderedDict(models)
+        self.loader = loader
+        self.default = default or next(iter(self.models))
+        if self.default not in self.models:
+            raise ValueError(f"Default model {self.default} is not configured")
+        self.budget_bytes = budget_bytes
+
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in self.models}
+        # name -> {"summarizer", "bytes", "inUse"}, least recently used first
+        self._resident = OrderedDict()
+        self._stats = {
+            name: {"loads": 0, "hits": 0, "evictions": 0, "lastLoadSeconds": None,
+                   "bytes": None, "lastUsed": None}
+            for name in self.models
+        }
+
+    def resolve(self, name):
+        """Return the model name to use for a request, raising ValueError if unknown"""
+        if name is None:
+            return self.default
+        if not isinstance(name, str) or not name:
+            raise ValueError("model must be a non-empty string")
+        if name not in self.models:
+            raise ValueError(f"Unknown model: {name}")
+        return name
+
+    @contextmanager
+    def acquire(self, name=None):
+        """Yield a loaded summarizer, pinning it so it is not evicted while in use"""
+        name = self.resolve(name)
+        entry = self._checkout(name)
+        try:
+            yield entry["summarizer"]
+        finally:
+            with self._lock:
+                entry["inUse"] -= 1
+                self._stats[name]["lastUsed"] = time.time()
+
+    def load(self, name=None):
+        """Make sure a model is resident without using it"""
+        with self.acquire(name):
+            pass
+
+    def _checkout(self, name):
+        with self._lock:
+            entry = self._pin(name)
+        if entry is not None:
+            return entry
+
+        with self._load_locks[name]:
+            # Another request may have finished loading while we waited
+            with self._lock:
+                entry = self._pin(name)
+            if entry is not None:
+                return entry
+
+            expected = self._stats[name]["bytes"] or estimate_disk_bytes(self.models[name]) or 0
+            self._evict_until_fits(expected)
+
+            start = time.perf_counter()
+            summarizer = self.loader(name, self.models[name])
+            elapsed = time.perf_counter() - start
+            size = model_bytes(summarizer)
+            print(f"Loaded model {name} in {elapsed:.1f}s ({size / 2**20:.0f} MiB)")
+
+            with self._lock:
+                entry = {"summarizer": summarizer, "bytes": size, "inUse": 1}
+                self._resident[name] = entry
+                stats = self._stats[name]
+                stats["loads"] += 1
+                stats["lastLoadSeconds"] = round(elapsed, 3)
+                stats["bytes"] = size
+            self._evict_until_fits(0)
+            return entry
+
+    def _pin(self, name):
+        """Mark a resident model as in use and most recently used; caller holds the lock"""
+        entry = self._resident.get(name)
+        if entry is not None:
+            entry["inUse"] += 1
+            self._resident.move_to_end(name)
+            self._stats[name]["hits"] += 1
+        return entry
+
+    def _resident_bytes(self):
+        return sum(entry["bytes"] for entry in self._resident.values())
+
+    def _evict_until_fits(self, incoming_bytes):
+        """Unload idle models, least recently used first, until the budget is met"""
+        if not self.budget_bytes:
+            return
+        evicted = []
+        with self._lock:
+            for name in list(self._resident):
+                if self._resident_bytes() + incoming_bytes <= self.budget_bytes:
+                    break
+                if self._resident[name]["inUse"]:
+                    continue
+                evicted.append((name, self._resident.pop(name)))
+                self._stats[name]["evictions"] += 1
+            over_budget = self._resident_bytes() + incoming_bytes > self.budget_bytes
+
+        for name, entry in evicted:
+            print(f"Evicting model {name} ({entry['bytes'] / 2**20:.0f} MiB)")
+            entry.clear()
+        if evicted:
+            self._release_memory()
+        if over_budget:
+            print("Model pool is over its memory budget; all remaining models are in use")
+
+    def _release_memory(self):
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def stats(self):
+        """Residency, load times and eviction counts for reporting"""
+        with self._lock:
+            models = {}
+            for name, path in self.models.items():
+                entry = self._resident.get(name)
+                models[name] = dict(
+                    self._stats[name],
+                    path=path,
+                    resident=entry is not None,
+                    inUse=entry["inUse"] if entry else 0,
+                )
+            return {
+                "default": self.default,
+                "budgetBytes": self.budget_bytes,
+                "residentBytes": self._resident_bytes(),
+                "residentOrder": list(self._resident),
+                "models": models,
+            }
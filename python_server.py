@@ -2,9 +2,16 @@
 import os
 import re
 import io
+import time
+import random
 from flask import Flask, request, jsonify
+from werkzeug.serving import WSGIRequestHandler
 from nltk.tokenize import sent_tokenize
 import nltk
+import autotune
+from model_pool import ModelPool, parse_model_specs
+from body_codec import BodyError, decode_stream
+from salience import filter_salient
 
 # Download required NLTK data
 try:
@@ -17,18 +24,61 @@ try:
 except LookupError:
     nltk.download('punkt_tab', quiet=True)
 
-# Lazy load transformers to minimize startup time
-summarizer = None
+# Pick up the tuned thread/batch/worker config for this host, if any
+autotune.load_config_for_host()
 
-def get_summarizer():
-    global summarizer
-    if summarizer is None:
-        print("Loading summarization model...")
-        from transformers import pipeline
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        print("Model loaded!")
+PORT = int(os.environ.get("PYTHON_SERVER_PORT", "5001"))
+# Share of words kept by the salience pre-filter; 1 disables it
+DEFAULT_KEEP_RATIO = float(os.environ.get("SALIENCE_KEEP_RATIO", "1"))
+
+class StubSummarizer:
+    """
+    Stand-in for the transformers pipeline used for load testing.
+
+    Sleeps for a fixed cost per call plus a cost per input word, optionally
+    fails a fraction of calls, and returns the leading words of each input.
+    """
+
+    def __init__(self):
+        self.base_latency = float(os.environ.get("STUB_BASE_MS", "50")) / 1000
+        self.word_latency = float(os.environ.get("STUB_MS_PER_WORD", "0.5")) / 1000
+        self.failure_rate = float(os.environ.get("STUB_FAILURE_RATE", "0"))
+
+    def __call__(self, texts, max_length=150, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        words = sum(len(text.split()) for text in texts)
+        time.sleep(self.base_latency + self.word_latency * words)
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Stub summarizer failure")
+        return [{"summary_text": " ".join(text.split()[:max_length // 2])} for text in texts]
+
+def load_summarizer(name, path):
+    """Load a summarization pipeline for the model pool"""
+    if os.environ.get("SUMMARIZER_BACKEND") == "stub":
+        print(f"Using stub summarizer for {name}")
+        return StubSummarizer()
+
+    print(f"Loading summarization model {name} from {path}...")
+    from transformers import pipeline
+    if not autotune.active_config["applied"]:
+        autotune.apply_config()
+    summarizer = pipeline("summarization", model=path)
+    print("Model loaded!")
+    if (os.environ.get("AUTOTUNE") == "1" and autotune.active_config["source"] == "default"
+            and name == model_pool.default):
+        autotune.tune(summarizer)
     return summarizer
 
+# Models are loaded lazily on first use to minimize startup time.
+# SUMMARIZER_MODELS is "name=path,..." where path is a local directory or hub id.
+model_pool = ModelPool(
+    parse_model_specs(os.environ.get("SUMMARIZER_MODELS", "bart-large-cnn=facebook/bart-large-cnn")),
+    load_summarizer,
+    default=os.environ.get("SUMMARIZER_DEFAULT_MODEL"),
+    budget_bytes=int(float(os.environ.get("MODEL_POOL_BUDGET_MB", "0")) * 2**20),
+)
+
 app = Flask(__name__)
 
 def get_overlap_sentences(sentences, overlap):
@@ -43,9 +93,8 @@ def get_overlap_sentences(sentences, overlap):
         count += sentence_words
     return overlap_chunk
 
-def chunk_by_sentences(text, length=600, overlap=50):
-    """Split text into chunks by sentences with overlap"""
-    sentences = sent_tokenize(text)
+def greedy_chunk_sentences(sentences, length=600, overlap=50):
+    """Pack sentences into chunks greedily, carrying overlap into the next chunk"""
     chunks = []
     current_chunk = []
     word_count = 0
@@ -66,60 +115,207 @@ def chunk_by_sentences(text, length=600, overlap=50):
 
     return chunks
 
+def balanced_chunk_sentences(sentences, length=600, overlap=50):
+    """
+    Partition sentences into the fewest chunks that fit the length limit,
+    then make them as even as possible.
+
+    A chunk whose own sentences start at index i is prefixed with the same
+    overlap sentences get_overlap_sentences would carry over. Dynamic
+    programming over the start index minimizes (chunk count, largest chunk,
+    sum of squared sizes), so a 520-word note at length 500 becomes two
+    ~300-word chunks instead of a full chunk and a mostly-overlap remainder.
+    A single sentence longer than the limit still gets its own chunk.
+    """
+    n = len(sentences)
+    if n == 0:
+        return []
+
+    words = [len(sentence.split(" ")) for sentence in sentences]
+    prefix = [0]
+    for count in words:
+        prefix.append(prefix[-1] + count)
+
+    # The whole note fits in one chunk
+    if prefix[n] <= length:
+        return [" ".join(sentences)]
+
+    # First sentence of the overlap carried into a chunk starting at i; it never
+    # moves backwards as i grows, so one pointer covers all starts
+    overlap_start = [0] * n
+    j = 0
+    for i in range(1, n):
+        while prefix[i] - prefix[j] > overlap:
+            j += 1
+        overlap_start[i] = j
+
+    # best[i] = (chunks, largest chunk, sum of squares, end of first chunk) for sentences[i:]
+    best = [None] * (n + 1)
+    best[n] = (0, 0, 0, n)
+    for i in range(n - 1, -1, -1):
+        carried = prefix[i] - prefix[overlap_start[i]]
+        for j in range(i + 1, n + 1):
+            size = carried + prefix[j] - prefix[i]
+            if size > length and j > i + 1:
+                break
+            rest = best[j]
+            candidate = (rest[0] + 1, max(size, rest[1]), rest[2] + size * size, j)
+            if best[i] is None or candidate < best[i]:
+                best[i] = candidate
+
+    chunks = []
+    i = 0
+    while i < n:
+        j = best[i][3]
+        chunks.append(" ".join(sentences[overlap_start[i]:j]))
+        i = j
+
+    return chunks
+
+CHUNK_STRATEGIES = {
+    "balanced": balanced_chunk_sentences,
+    "greedy": greedy_chunk_sentences,
+}
+
+def chunk_sentences(sentences, length=600, overlap=50, strategy="balanced"):
+    """Split tokenized sentences into chunks with the given strategy"""
+    if strategy not in CHUNK_STRATEGIES:
+        raise ValueError(f"Unknown chunk strategy: {strategy}")
+    return CHUNK_STRATEGIES[strategy](sentences, length, overlap)
+
+def chunk_by_sentences(text, length=600, overlap=50, strategy="balanced"):
+    """Split text into chunks by sentences with overlap"""
+    return chunk_sentences(sent_tokenize(text), length, overlap, strategy)
+
+def summarize_chunks(summarizer, chunks):
+    """
+    Summarize chunks in batches, passing short chunks through as-is.
+
+    Returns the summary parts and the number of chunks that fell back to
+    truncation because the model call failed.
+    """
+    summary_parts = list(chunks)
+    fallbacks = 0
+    # Ensure chunk is long enough for summarization (min 50 tokens)
+    long_chunks = [i for i, chunk in enumerate(chunks) if len(chunk.split()) > 50]
+    batch_size = autotune.active_config["batchSize"] or 1
+
+    for start in range(0, len(long_chunks), batch_size):
+        batch = long_chunks[start:start + batch_size]
+        try:
+            with autotune.inference_gate.shared():
+                results = summarizer([chunks[i] for i in batch], batch_size=len(batch),
+                                     max_length=150, min_length=30, do_sample=False)
+            for i, result in zip(batch, results):
+                summary_parts[i] = result["summary_text"]
+        except Exception as e:
+            print(f"Error summarizing chunk: {e}")
+            for i in batch:
+                summary_parts[i] = chunks[i][:200]
+            fallbacks += len(batch)
+
+    return summary_parts, fallbacks
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({"status": "ok"})
 
-@app.route('/summarize', methods=['POST'])
-def summarize():
+@app.route('/models', methods=['GET'])
+def models():
+    return jsonify(model_pool.stats())
+
+@app.route('/config', methods=['GET'])
+def config():
+    return jsonify(dict(autotune.active_config, host=autotune.host_fingerprint()))
+
+@app.route('/config/tune', methods=['POST'])
+def config_tune():
     try:
-        data = request.json
-        content = data.get('content', '')
-        chunk_length = data.get('chunkLength', 500)
-        overlap_length = data.get('overlapLength', 50)
+        with model_pool.acquire() as summarizer:
+            best, results = autotune.tune(summarizer)
+        return jsonify({"best": best, "results": results})
+    except Exception as e:
+        print(f"Error tuning: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        if not content:
-            return jsonify({"error": "No content provided"}), 400
+def prepare_request(data):
+    """Validate a /summarize payload and split its content into chunks"""
+    content = data.get('content', '')
+    chunk_length = data.get('chunkLength', 500)
+    overlap_length = data.get('overlapLength', 50)
+    chunk_strategy = data.get('chunkStrategy', 'balanced')
+    if not isinstance(chunk_strategy, str):
+        raise ValueError("chunkStrategy must be a string")
+    model = model_pool.resolve(data.get('model'))
+    keep_ratio = data.get('keepRatio')
+    try:
+        keep_ratio = DEFAULT_KEEP_RATIO if keep_ratio is None else float(keep_ratio)
+    except TypeError:
+        raise ValueError("keepRatio must be a number")
 
-        # Clean text
-        text = re.sub(r'\s+', ' ', content).strip()
-        word_count = len(text.split(" "))
+    if not 0 < keep_ratio <= 1:
+        raise ValueError("keepRatio must be between 0 and 1")
 
-        if word_count > 2000:
-            return jsonify({
-                "error": f"Document exceeds 2000 words ({word_count} words)"
-            }), 400
+    if not content:
+        raise ValueError("No content provided")
+
+    # Clean text
+    text = re.sub(r'\s+', ' ', content).strip()
+    word_count = len(text.split(" "))
+
+    if word_count > 2000:
+        raise ValueError(f"Document exceeds 2000 words ({word_count} words)")
+
+    # Drop low-salience sentences before chunking, if enabled
+    sentences = sent_tokenize(text)
+    kept_words = word_count
+    if keep_ratio < 1:
+        sentences = filter_salient(sentences, keep_ratio)
+        kept_words = sum(len(sentence.split(" ")) for sentence in sentences)
+
+    # Get chunks
+    chunks = chunk_sentences(sentences, chunk_length, overlap_length, chunk_strategy)
+
+    return {"wordCount": word_count, "keptWordCount": kept_words, "chunks": chunks, "model": model}
+
+def summary_response(job, summary_parts, fallbacks):
+    """Build the /summarize response body shared by the Flask and ASGI servers"""
+    return {
+        "summary": " ".join(summary_parts),
+        "wordCount": job["wordCount"],
+        "chunkCount": len(job["chunks"]),
+        "keptWordCount": job["keptWordCount"],
+        "inputReduction": round(1 - job["keptWordCount"] / job["wordCount"], 4),
+        "fallbackChunks": fallbacks,
+        "model": job["model"]
+    }
+
+@app.route('/summarize', methods=['POST'])
+def summarize():
+    try:
+        try:
+            data = decode_stream(request.stream, request.headers.get('Content-Encoding'),
+                                 request.headers.get('Content-Type'))
+            job = prepare_request(data)
+        except BodyError as e:
+            return jsonify({"error": str(e)}), e.status
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        # Get chunks
-        chunks = chunk_by_sentences(text, chunk_length, overlap_length)
-        
         # Summarize each chunk
-        summarizer = get_summarizer()
-        summary_parts = []
-        
-        for chunk in chunks:
-            # Ensure chunk is long enough for summarization (min 50 tokens)
-            if len(chunk.split()) > 50:
-                try:
-                    result = summarizer(chunk, max_length=150, min_length=30, do_sample=False)
-                    summary_parts.append(result[0]["summary_text"])
-                except Exception as e:
-                    print(f"Error summarizing chunk: {e}")
-                    summary_parts.append(chunk[:200])
-            else:
-                summary_parts.append(chunk)
-        
-        summary = " ".join(summary_parts)
-        
-        return jsonify({
-            "summary": summary,
-            "wordCount": word_count,
-            "chunkCount": len(chunks)
-        })
+        with model_pool.acquire(job["model"]) as summarizer:
+            summary_parts, fallbacks = summarize_chunks(summarizer, job["chunks"])
+
+        return jsonify(summary_response(job, summary_parts, fallbacks))
 
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=False)
+    if os.environ.get("AUTOTUNE") == "1":
+        # Load (and tune, if this host has no stored config) before serving
+        model_pool.load()
+    # HTTP/1.1 keeps connections from the Express keep-alive agent open
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    app.run(host='0.0.0.0', port=PORT, debug=False)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark the salience pre-filter: latency saved versus ROUGE loss.
+
+Each document is summarized once per keep ratio. ROUGE-1/2/L F1 is computed
+against the unfiltered (keepRatio=1) summary, so it measures how much of the
+full-input summary survives the filter rather than quality against a human
+reference.
+
+Examples:
+    python3 script/bench_salience.py notes/*.txt --ratios 1 0.8 0.6 0.4
+    SUMMARIZER_BACKEND=stub python3 script/bench_salience.py notes/*.txt
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from python_server import model_pool, prepare_request, summarize_chunks  # noqa: E402
+
+SAMPLE_NOTE = """
+Biology 101 - Lecture 4 Notes. Biology 101 - Lecture 4 Notes.
+Cells are the basic structural and functional unit of all living organisms.
+Prokaryotic cells lack a nucleus, while eukaryotic cells keep their DNA inside a membrane-bound nucleus.
+- organelles
+- membranes
+The mitochondria produce most of the cell's ATP through aerobic respiration, which consumes oxygen and glucose.
+Chloroplasts, found in plants and algae, capture light energy and convert it into chemical energy during photosynthesis.
+The cell membrane is a phospholipid bilayer that controls which molecules enter and leave the cell.
+Proteins embedded in the membrane act as channels, pumps and receptors for signals from other cells.
+Biology 101 - Lecture 4 Notes.
+Ribosomes translate messenger RNA into proteins, and the endoplasmic reticulum folds and transports them.
+The Golgi apparatus modifies, sorts and packages proteins for secretion or delivery to other organelles.
+Lysosomes break down worn-out organelles and material taken in from outside the cell.
+Exam tip: know the function of each organelle.
+References: Alberts et al. (2015) Molecular Biology of the Cell, 6th edition.
+Campbell et al. (2017) Biology, 11th edition. https://example.edu/bio101/lecture4
+"""
+
+
+def tokens(text):
+    return text.lower().split()
+
+
+def ngrams(words, n):
+    return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+
+
+def f1(overlap, candidate_total, reference_total):
+    if not overlap or not candidate_total or not reference_total:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    cand, ref = ngrams(tokens(candidate), n), ngrams(tokens(reference), n)
+    return f1(sum((cand & ref).values()), sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate, reference):
+    cand, ref = tokens(candidate), tokens(reference)
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(ref) + 1)
+    for word in cand:
+        current = [0]
+        for j, ref_word in enumerate(ref):
+            current.append(previous[j] + 1 if word == ref_word else max(previous[j + 1], current[j]))
+        previous = current
+    return f1(previous[-1], len(cand), len(ref))
+
+
+def summarize_document(content, keep_ratio, args):
+    start = time.perf_counter()
+    job = prepare_request({
+        "content": content,
+        "chunkLength": args.chunk_length,
+        "overlapLength": args.overlap_length,
+        "keepRatio": keep_ratio,
+        "model": args.model,
+    })
+    with model_pool.acquire(job["model"]) as summarizer:
+        summary_parts, _ = summarize_chunks(summarizer, job["chunks"])
+    return " ".join(summary_parts), job, time.perf_counter() - start
+
+
+def main(args):
+    documents = []
+    for path in args.files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            documents.append((os.path.basename(path), f.read()))
+    if not documents:
+        documents.append(("sample", SAMPLE_NOTE))
+
+    # Load the model before timing anything
+    model_pool.load(args.model)
+
+    totals = {ratio: {"seconds": 0.0, "words": 0, "chunks": 0, "r1": 0.0, "r2": 0.0, "rl": 0.0}
+              for ratio in args.ratios}
+    for name, content in documents:
+        baseline = None
+        for ratio in sorted(args.ratios, reverse=True):
+            summary, job, seconds = summarize_document(content, ratio, args)
+            if baseline is None:
+                baseline = summary
+            row = totals[ratio]
+            row["seconds"] += seconds
+            row["words"] += job["keptWordCount"]
+            row["chunks"] += len(job["chunks"])
+            row["r1"] += rouge_n(summary, baseline, 1)
+            row["r2"] += rouge_n(summary, baseline, 2)
+            row["rl"] += rouge_l(summary, baseline)
+            print(f"{name}: keepRatio={ratio} {job['keptWordCount']}/{job['wordCount']} words, "
+                  f"{len(job['chunks'])} chunks, {seconds:.2f}s")
+
+    count = len(documents)
+    reference = totals[max(args.ratios)]
+    print()
+    print(f"{'keep':>6} {'words':>7} {'chunks':>7} {'latency':>9} {'saved':>7} "
+          f"{'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8}")
+    for ratio in sorted(args.ratios, reverse=True):
+        row = totals[ratio]
+        saved = 1 - row["seconds"] / reference["seconds"] if reference["seconds"] else 0
+        print(f"{ratio:>6.2f} {row['words']:>7} {row['chunks']:>7} "
+              f"{row['seconds'] / count:>8.2f}s {saved:>7.1%} "
+              f"{row['r1'] / count:>8.3f} {row['r2'] / count:>8.3f} {row['rl'] / count:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the salience pre-filter")
+    parser.add_argument("files", nargs="*", help="Text files to summarize (default: built-in sample)")
+    parser.add_argument("--ratios", type=float, nargs="+", default=[1.0, 0.8, 0.6, 0.4],
+                        help="Keep ratios to compare; the largest is the ROUGE reference")
+    parser.add_argument("--chunk-length", type=int, default=500)
+    parser.add_argument("--overlap-length", type=int, default=50)
+    parser.add_argument("--model", help="Model pool entry to use (default: pool default)")
+    main(parser.parse_args())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for the Python summarization server.
+
+Replays a JSONL request log or a synthetic traffic mix against /summarize at
+a target request rate (open loop) or concurrency (closed loop), and reports
+latency percentiles, error and fallback rates, and throughput over time.
+
+Examples:
+    # Start a stub-backed Flask server and drive 5 req/s for 30 seconds
+    python3 script/loadtest.py --start-server flask --stub --rate 5 --duration 30
+
+    # Replay a request log against an already running server, 8 in flight
+    python3 script/loadtest.py --log requests.jsonl --concurrency 8 --requests 200
+
+Log lines are JSON objects with a `content` field plus optional
+`chunkLength`, `overlapLength`, `chunkStrategy`; lines without `content`
+use their `title` and `body` as the document text.
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPTS = {
+    "flask": os.path.join(ROOT, "python_server.py"),
+    "asgi": os.path.join(ROOT, "asgi_server.py"),
+}
+
+# (words, weight) buckets for the synthetic document size mix
+SYNTHETIC_SIZES = [(80, 0.2), (300, 0.35), (700, 0.25), (1200, 0.15), (1900, 0.05)]
+SYNTHETIC_CHUNK_LENGTHS = [300, 500, 800]
+SYNTHETIC_OVERLAPS = [0, 50, 100]
+VOCABULARY = (
+    "the cell membrane protein energy lecture notes exam chapter theory model "
+    "students learn process function system data result analysis history war "
+    "economy market policy equation graph variable reaction molecule structure"
+).split()
+
+
+def load_log(path):
+    payloads = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            content = entry.get("content") or "\n".join(
+                part for part in (entry.get("title"), entry.get("body")) if part
+            )
+            if not content:
+                continue
+            payload = {"content": content}
+            for key in ("chunkLength", "overlapLength", "chunkStrategy"):
+                if key in entry:
+                    payload[key] = entry[key]
+            payloads.append(payload)
+    return payloads
+
+
+def synthetic_document(words, rng):
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(6, 25))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def synthetic_payloads(count, seed):
+    rng = random.Random(seed)
+    sizes, weights = zip(*SYNTHETIC_SIZES)
+    return [
+        {
+            "content": synthetic_document(rng.choices(sizes, weights)[0], rng),
+            "chunkLength": rng.choice(SYNTHETIC_CHUNK_LENGTHS),
+            "overlapLength": rng.choice(SYNTHETIC_OVERLAPS),
+        }
+        for _ in range(count)
+    ]
+
+
+async def http_request(host, port, method, path, body=None, timeout=300):
+    """Minimal HTTP/1.1 client: one connection per request, response read to EOF"""
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("ascii") + data)
+        await writer.drain()
+        raw = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+
+    header, _, payload = raw.partition(b"\r\n\r\n")
+    status_line = header.split(b"\r\n", 1)[0].split(b" ", 2)
+    if len(status_line) < 2 or not status_line[1].isdigit():
+        raise ConnectionError("Connection closed without a valid HTTP response")
+    status = int(status_line[1])
+    try:
+        return status, json.loads(payload or b"{}")
+    except ValueError:
+        return status, {}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.samples = []
+
+    async def run(self, host, port, payload, timeout):
+        sent = time.perf_counter()
+        sample = {"sentAt": sent - self.start, "status": None, "error": None}
+        try:
+            status, body = await http_request(host, port, "POST", "/summarize", payload, timeout)
+            sample["status"] = status
+            sample["chunkCount"] = body.get("chunkCount", 0)
+            sample["fallbackChunks"] = body.get("fallbackChunks", 0)
+            if status != 200:
+                sample["error"] = body.get("error", f"HTTP {status}")
+        except Exception as e:
+            sample["error"] = f"{type(e).__name__}: {e}"
+        done = time.perf_counter()
+        sample["latency"] = done - sent
+        sample["doneAt"] = done - self.start
+        self.samples.append(sample)
+
+    def report(self):
+        elapsed = max((s["doneAt"] for s in self.samples), default=0)
+        ok = [s for s in self.samples if s["error"] is None]
+        latencies = sorted(s["latency"] for s in ok)
+        chunks = sum(s["chunkCount"] for s in ok)
+        fallbacks = sum(s["fallbackChunks"] for s in ok)
+
+        throughput = {}
+        for s in ok:
+            second = int(s["doneAt"])
+            throughput[second] = throughput.get(second, 0) + 1
+
+        errors = {}
+        for s in self.samples:
+            if s["error"] is not None:
+                errors[s["error"]] = errors.get(s["error"], 0) + 1
+
+        return {
+            "requests": len(self.samples),
+            "succeeded": len(ok),
+            "errorRate": (len(self.samples) - len(ok)) / len(self.samples) if self.samples else 0,
+            "errors": errors,
+            "fallbackChunkRate": fallbacks / chunks if chunks else 0,
+            "requestsWithFallback": sum(1 for s in ok if s["fallbackChunks"]),
+            "latency": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "elapsed": elapsed,
+            "throughput": len(ok) / elapsed if elapsed else 0,
+            "throughputPerSecond": [throughput.get(i, 0) for i in range(int(elapsed) + 1)],
+        }
+
+
+async def run_open_loop(recorder, host, port, payloads, rate, duration, max_requests, timeout):
+    """Send requests at a fixed Poisson rate regardless of how fast responses come back"""
+    rng = random.Random(0)
+    tasks = []
+    deadline = time.perf_counter() + duration
+    sent = 0
+    while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+        payload = payloads[sent % len(payloads)]
+        tasks.append(asyncio.create_task(recorder.run(host, port, payload, timeout)))
+        sent += 1
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+
+
+async def run_closed_loop(recorder, host, port, payloads, concurrency, duration, max_requests, timeout):
+    """Keep a fixed number of requests in flight"""
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests if max_requests is not None else sys.maxsize))
+
+    async def worker():
+        for i in counter:
+            if time.perf_counter() >= deadline:
+                return
+            await recorder.run(host, port, payloads[i % len(payloads)], timeout)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def wait_for_health(host, port, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            status, _ = await http_request(host, port, "GET", "/health", timeout=5)
+            if status == 200:
+                return
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server on port {port} did not become healthy within {timeout}s")
+
+
+def start_server(mode, port, stub):
+    env = dict(os.environ, PYTHON_SERVER_PORT=str(port))
+    if stub:
+        env["SUMMARIZER_BACKEND"] = "stub"
+    print(f"Starting {mode} server on port {port}{' with stub model' if stub else ''}...")
+    return subprocess.Popen([sys.executable, SERVER_SCRIPTS[mode]], cwd=ROOT, env=env)
+
+
+def print_report(report):
+    latency = report["latency"]
+
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f} ms"
+
+    print()
+    print(f"Requests:       {report['requests']} ({report['succeeded']} ok)")
+    print(f"Error rate:     {report['errorRate']:.2%}")
+    for error, count in sorted(report["errors"].items(), key=lambda e: -e[1]):
+        print(f"  {count:5d}  {error}")
+    print(f"Fallback rate:  {report['fallbackChunkRate']:.2%} of chunks, "
+          f"{report['requestsWithFallback']} requests affected")
+    print(f"Latency:        p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  "
+          f"p99 {ms(latency['p99'])}  max {ms(latency['max'])}")
+    print(f"Throughput:     {report['throughput']:.2f} req/s over {report['elapsed']:.1f}s")
+    print(f"Per second:     {' '.join(str(n) for n in report['throughputPerSecond'])}")
+
+
+async def main(args):
+    url = urlparse(args.url)
+    host, port = url.hostname, url.port or 80
+
+    if args.log:
+        payloads = load_log(args.log)
+    else:
+        payloads = synthetic_payloads(args.synthetic, args.seed)
+    if not payloads:
+        raise SystemExit("No requests to send")
+
+    server = None
+    if args.start_server:
+        server = start_server(args.start_server, port, args.stub)
+    try:
+        await wait_for_health(host, port, args.startup_timeout)
+        recorder = Recorder()
+        if args.rate:
+            await run_open_loop(recorder, host, port, payloads, args.rate,
+                                args.duration, args.requests, args.timeout)
+        else:
+            await run_closed_loop(recorder, host, port, payloads, args.concurrency,
+                                  args.duration, args.requests, args.timeout)
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    report = recorder.report()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"report": report, "samples": recorder.samples}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the summarization server")
+    parser.add_argument("--url", default="http://localhost:5001", help="Server base URL")
+    parser.add_argument("--log", help="JSONL request log to replay")
+    parser.add_argument("--synthetic", type=int, default=100,
+                        help="Number of synthetic requests to generate when no log is given")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic mix")
+    parser.add_argument("--rate", type=float, help="Target requests per second (open loop)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Requests in flight when --rate is not set (closed loop)")
+    parser.add_argument("--duration", type=float, default=60, help="Test length in seconds")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--start-server", choices=sorted(SERVER_SCRIPTS),
+                        help="Start a local server on the --url port for the run")
+    parser.add_argument("--stub", action="store_true",
+                        help="Use the stub model backend in the started server")
+    parser.add_argument("--startup-timeout", type=float, default=600,
+                        help="Seconds to wait for the server to report healthy")
+    parser.add_argument("--output", help="Write the report and raw samples as JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -1,5 +1,7 @@
 import type { Express, Request, Response } from "express";
-import { createServer, type Server } from "http";
+import http, { createServer, type Server } from "http";
+import { gzip } from "zlib";
+import { promisify } from "util";
 import { storage } from "./storage";
 import { summaryParametersSchema } from "@shared/schema";
 import multer from "multer";
@@ -8,27 +10,75 @@ const upload = multer({ storage: multer.memoryStorage() });
 
 const PYTHON_SERVER = "http://localhost:5001";
 
+// Reuse connections to the Python server instead of opening one per upload
+const pythonServerAgent = new http.Agent({ keepAlive: true, maxSockets: 16 });
+
+// Bodies smaller than this are sent uncompressed; gzip costs more than it saves
+const COMPRESSION_THRESHOLD = 1024;
+
+const gzipAsync = promisify(gzip);
+
+function postToPythonServer(
+  path: string,
+  body: Buffer,
+  headers: Record<string, string>
+): Promise<{ status: number; data: any }> {
+  return new Promise((resolve, reject) => {
+    const req = http.request(
+      `${PYTHON_SERVER}${path}`,
+      {
+        method: "POST",
+        agent: pythonServerAgent,
+        headers: { ...headers, "Content-Length": body.length },
+      },
+      (res) => {
+        const chunks: Buffer[] = [];
+        res.on("data", (chunk: Buffer) => chunks.push(chunk));
+        res.on("error", reject);
+        res.on("end", () => {
+          try {
+            resolve({
+              status: res.statusCode ?? 0,
+              data: JSON.parse(Buffer.concat(chunks).toString("utf-8")),
+            });
+          } catch (error) {
+            reject(error);
+          }
+        });
+      }
+    );
+    req.on("error", reject);
+    req.end(body);
+  });
+}
+
 async function callPythonServer(
   content: string,
   chunkLength: number,
   overlapLength: number
 ) {
-  const response = await fetch(`${PYTHON_SERVER}/summarize`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({
+  const json = Buffer.from(
+    JSON.stringify({
       content,
       chunkLength,
       overlapLength,
     }),
-  });
+    "utf-8"
+  );
+  const headers: Record<string, string> = { "Content-Type": "application/json" };
+  let body = json;
+  if (json.length >= COMPRESSION_THRESHOLD) {
+    body = await gzipAsync(json);
+    headers["Content-Encoding"] = "gzip";
+  }
+
+  const response = await postToPythonServer("/summarize", body, headers);
 
-  if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.error || "Summarization failed");
+  if (response.status < 200 || response.status >= 300) {
+    throw new Error(response.data.error || "Summarization failed");
   }
 
-  return response.json();
+  return response.data;
 }
 
 export async function registerRoutes(
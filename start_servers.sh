@@ -2,11 +2,15 @@
 
 # Install Python dependencies
 echo "Installing Python dependencies..."
-python3 -m pip install -q Flask transformers torch nltk PyPDF2 python-docx 2>/dev/null || python3 -m pip install Flask transformers torch nltk PyPDF2 python-docx
+python3 -m pip install -q Flask starlette uvicorn transformers torch nltk PyPDF2 python-docx 2>/dev/null || python3 -m pip install Flask starlette uvicorn transformers torch nltk PyPDF2 python-docx
 
-# Start Python server in background
+# Start Python server in background (PYTHON_SERVER_MODE=asgi for the async server)
 echo "Starting Python summarization server on port 5001..."
-python3 python_server.py &
+if [ "$PYTHON_SERVER_MODE" = "asgi" ]; then
+    python3 asgi_server.py &
+else
+    python3 python_server.py &
+fi
 PYTHON_PID=$!
 
 # Give Python server time to start